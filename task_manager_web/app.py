@@ -1,49 +1,77 @@
-from flask import Flask, render_template, jsonify, request, abort, redirect, url_for, flash
+from flask import Flask, Blueprint, render_template, jsonify, request, abort, redirect, url_for, flash, g, send_file
 import os
 import json
 import uuid
-import tempfile
+import time
 from datetime import datetime
 
-app = Flask(__name__, static_folder='static', template_folder='templates')
-app.secret_key = 'change-me-in-production-please'
+from utils import (
+    read_tasks as load_tasks, write_tasks as save_tasks, add_notification, clear_notifications,
+    count_notifications, latest_notifications, notifications_since, warm_task_cache,
+    DEFAULT_TENANT, set_current_tenant, reset_current_tenant, current_tenant, validate_tenant,
+)
+from flask import make_response, Response
+from display import format_display_ts, format_ts, parse_due_date, due_label
 
-from utils import read_tasks as load_tasks, write_tasks as save_tasks, add_notification, read_notifications, clear_notifications
-from flask import make_response
+bp = Blueprint('main', __name__)
 
+# Used only in DEBUG/TESTING apps when neither the config nor
+# $TASK_MANAGER_SECRET_KEY sets a key.
+_DEV_SECRET_KEY = 'change-me-in-production-please'
 
-def _format_display_ts(iso_str: str) -> str:
-    """Return a human display string for an ISO date/datetime.
+# Requests are routed to a tenant's storage shard by this header, falling
+# back to the `tenant` cookie and then the default shard.
+TENANT_HEADER = 'X-Tenant'
+TENANT_COOKIE = 'tenant'
 
-    - Date-only strings (e.g. 'YYYY-MM-DD') -> 'DD-MM-YYYY'
-    - Datetime strings (with time) -> 'DD-MM-YYYY HH:MM:SS'
-    Falls back to the original string on parse error.
-    """
-    if not iso_str:
-        return ''
-    try:
-        dt = datetime.fromisoformat(str(iso_str))
-        if 'T' not in str(iso_str) and dt.hour == 0 and dt.minute == 0 and dt.second == 0:
-            return dt.strftime('%d-%m-%Y')
-        return dt.strftime('%d-%m-%Y %H:%M:%S')
-    except Exception:
-        return str(iso_str)
+# Seconds between notification-file polls for `/api/notifications/stream`.
+STREAM_POLL_SECONDS = 2.0
+
+# Persisted notifications shown per page on `/notifications`.
+NOTIFICATIONS_PAGE_SIZE = 50
 
 
 """Flask web application for the Task Manager dashboard.
 
 This module defines the HTTP routes used by the UI and a small JSON-backed
-API. Tasks are read/written via `utils.read_tasks` / `utils.write_tasks`.
+API on the `main` blueprint, and the `create_app(config)` factory that
+builds an application from it. Tasks are read/written via
+`utils.read_tasks` / `utils.write_tasks`.
+
+Each request is routed to its tenant's storage shard (see `resolve_tenant`).
 
 Routes:
 - `/` : dashboard view
 - `/api/tasks` : GET/POST API for tasks
 - `/api/tasks/<id>` : PUT/DELETE API endpoints
+- `/api/notifications/stream` : Server-Sent Events feed of new notifications
+- `/api/jobs`, `/api/jobs/<id>`, `/api/jobs/<id>/result` : background export/stats jobs
 - `/add-task`, `/update-task/<id>`, `/delete-task/<id>` : form-backed endpoints
 """
 
 
-@app.route('/')
+def resolve_tenant(header_value=None, cookie_value=None) -> str:
+    """Pick the tenant for a request; raises ValueError for unsafe ids."""
+    return validate_tenant(header_value or cookie_value or DEFAULT_TENANT)
+
+
+@bp.before_request
+def _route_to_tenant_shard():
+    try:
+        tenant = resolve_tenant(request.headers.get(TENANT_HEADER), request.cookies.get(TENANT_COOKIE))
+    except ValueError:
+        abort(400, 'invalid tenant id')
+    g.tenant_token = set_current_tenant(tenant)
+
+
+@bp.teardown_request
+def _reset_tenant_shard(exc=None):
+    token = g.pop('tenant_token', None)
+    if token is not None:
+        reset_current_tenant(token)
+
+
+@bp.route('/')
 def dashboard():
     """Render the dashboard view.
 
@@ -56,33 +84,10 @@ def dashboard():
     for t in tasks:
         # completed flag from either boolean or status field
         t['completed'] = bool(t.get('completed')) or str(t.get('status', '')).lower() in ('done', 'completed')
-        # compute due label
-        due_raw = t.get('due_date')
-        due_label = None
-        if due_raw:
-            try:
-                # accept date or datetime in ISO format
-                due_dt = datetime.fromisoformat(due_raw).date()
-                delta = (due_dt - now).days
-                if delta < 0:
-                    due_label = 'Overdue'
-                elif delta == 0:
-                    due_label = 'Today'
-                elif delta == 1:
-                    due_label = 'Tomorrow'
-                elif delta <= 7:
-                    due_label = 'This week'
-                else:
-                    due_label = due_dt.strftime('%b %d')
-            except Exception:
-                due_label = None
-        t['due_label'] = due_label
-        # formatted display strings for due/created
-        t['due_display'] = _format_display_ts(t.get('due_date'))
-        t['created_display'] = _format_display_ts(t.get('created_at'))
-        # formatted display strings for due/created
-        t['due_display'] = _format_display_ts(t.get('due_date'))
-        t['created_display'] = _format_display_ts(t.get('created_at'))
+        # due label and display strings come from the memoized display layer
+        t['due_label'] = due_label(t.get('due_date'), now)
+        t['due_display'] = format_display_ts(t.get('due_date'))
+        t['created_display'] = format_display_ts(t.get('created_at'))
     total_tasks = len(tasks)
     completed_tasks = sum(1 for t in tasks if bool(t.get('completed')) or str(t.get('status')).lower() in ('done', 'completed'))
     pending_tasks = total_tasks - completed_tasks
@@ -139,13 +144,7 @@ def dashboard():
     sort_by = request.args.get('sort')
     order = request.args.get('order', 'asc')
     def _parse_due(t):
-        d = t.get('due_date')
-        if not d:
-            return None
-        try:
-            return datetime.fromisoformat(d).date()
-        except Exception:
-            return None
+        return parse_due_date(t.get('due_date'))
 
     if sort_by == 'due':
         # sort by due date, None goes to end
@@ -170,12 +169,12 @@ def dashboard():
         active_sort=sort_by,
         active_order=order,
         selected_date=date_filter if date_filter else None,
-        unread_count=len(read_notifications()),
+        unread_count=count_notifications(),
         category_counts=category_counts,
     )
 
 
-@app.route('/my-tasks')
+@bp.route('/my-tasks')
 def my_tasks():
     """Render a standalone My Tasks page showing the task list and controls.
 
@@ -186,25 +185,8 @@ def my_tasks():
     now = datetime.utcnow().date()
     for t in tasks:
         t['completed'] = bool(t.get('completed')) or str(t.get('status', '')).lower() in ('done', 'completed')
-        due_raw = t.get('due_date')
-        due_label = None
-        if due_raw:
-            try:
-                due_dt = datetime.fromisoformat(due_raw).date()
-                delta = (due_dt - now).days
-                if delta < 0:
-                    due_label = 'Overdue'
-                elif delta == 0:
-                    due_label = 'Today'
-                elif delta == 1:
-                    due_label = 'Tomorrow'
-                elif delta <= 7:
-                    due_label = 'This week'
-                else:
-                    due_label = due_dt.strftime('%b %d')
-            except Exception:
-                due_label = None
-        t['due_label'] = due_label
+        t['due_label'] = due_label(t.get('due_date'), now)
+        t['due_display'] = format_display_ts(t.get('due_date'))
 
     total_tasks = len(tasks)
     completed_tasks = sum(1 for t in tasks if bool(t.get('completed')) or str(t.get('status')).lower() in ('done', 'completed'))
@@ -234,13 +216,7 @@ def my_tasks():
     sort_by = request.args.get('sort')
     order = request.args.get('order', 'asc')
     def _parse_due(t):
-        d = t.get('due_date')
-        if not d:
-            return None
-        try:
-            return datetime.fromisoformat(d).date()
-        except Exception:
-            return None
+        return parse_due_date(t.get('due_date'))
 
     if sort_by == 'due':
         filtered_tasks.sort(key=lambda x: (_parse_due(x) is None, _parse_due(x) or datetime.max.date()), reverse=(order=='desc'))
@@ -276,18 +252,18 @@ def my_tasks():
         filter_counts=filter_counts,
         active_sort=sort_by,
         active_order=order,
-        unread_count=len(read_notifications()),
+        unread_count=count_notifications(),
         category_counts=category_counts,
     )
 
 
-@app.route('/api/tasks', methods=['GET'])
+@bp.route('/api/tasks', methods=['GET'])
 def api_get_tasks():
     """Return the full list of tasks as JSON."""
     return jsonify(load_tasks())
 
 
-@app.route('/api/tasks', methods=['POST'])
+@bp.route('/api/tasks', methods=['POST'])
 def api_add_task():
     """Create a new task via JSON API.
 
@@ -320,7 +296,7 @@ def api_add_task():
     return jsonify(task), 201
 
 
-@app.route('/api/tasks/<task_id>', methods=['PUT'])
+@bp.route('/api/tasks/<task_id>', methods=['PUT'])
 def api_update_task(task_id):
     """Update a task by `task_id` via JSON API.
 
@@ -345,7 +321,7 @@ def api_update_task(task_id):
     return jsonify({'error': 'task not found'}), 404
 
 
-@app.route('/api/tasks/<task_id>', methods=['DELETE'])
+@bp.route('/api/tasks/<task_id>', methods=['DELETE'])
 def api_delete_task(task_id):
     """Delete a task by `task_id` via JSON API.
 
@@ -369,7 +345,7 @@ def api_delete_task(task_id):
 
 
 
-@app.route('/add-task', methods=['POST'])
+@bp.route('/add-task', methods=['POST'])
 def add_task():
     """Create a new task from a submitted form (modal or header form).
 
@@ -405,10 +381,10 @@ def add_task():
     except Exception:
         pass
     flash('Task added', 'success')
-    return redirect(url_for('dashboard'))
+    return redirect(url_for('.dashboard'))
 
 
-@app.route('/update-task/<task_id>', methods=['POST'])
+@bp.route('/update-task/<task_id>', methods=['POST'])
 def update_task(task_id):
     """Handle form-based updates for a specific task.
 
@@ -454,11 +430,11 @@ def update_task(task_id):
                 next_url = request.referrer
             if next_url:
                 return redirect(next_url)
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('.dashboard'))
     abort(404, 'task not found')
 
 
-@app.route('/delete-task/<task_id>', methods=['POST'])
+@bp.route('/delete-task/<task_id>', methods=['POST'])
 def delete_task(task_id):
     """Delete a task submitted from a form.
 
@@ -479,19 +455,28 @@ def delete_task(task_id):
     except Exception:
         pass
     flash('Task deleted', 'success')
-    return redirect(url_for('dashboard'))
+    return redirect(url_for('.dashboard'))
 
 
-@app.route('/notifications')
+@bp.route('/notifications')
 def notifications():
     """Show persisted notifications and generated due-soon alerts.
 
-    The view shows persisted events (add/update/delete) and also
-    computes due-soon alerts for tasks due today or tomorrow.
+    The view shows persisted events (add/update/delete) newest first,
+    paginated via `?page=N`, and also computes due-soon alerts for tasks
+    due today or tomorrow (shown on the first page only). Only the segments
+    needed for the requested page are read.
     """
-    notes = read_notifications()
+    try:
+        page = max(1, int(request.args.get('page', 1)))
+    except ValueError:
+        page = 1
+    # fetch one extra entry to know whether an older page exists
+    notes = latest_notifications(NOTIFICATIONS_PAGE_SIZE + 1, offset=(page - 1) * NOTIFICATIONS_PAGE_SIZE)
+    has_next = len(notes) > NOTIFICATIONS_PAGE_SIZE
+    notes = notes[:NOTIFICATIONS_PAGE_SIZE]
     # derive due-soon alerts
-    tasks = load_tasks()
+    tasks = load_tasks() if page == 1 else []
     now = datetime.utcnow().date()
     due_alerts = []
     for t in tasks:
@@ -500,11 +485,8 @@ def notifications():
         if completed:
             continue
         due_raw = t.get('due_date')
-        if not due_raw:
-            continue
-        try:
-            due_dt = datetime.fromisoformat(due_raw).date()
-        except Exception:
+        due_dt = parse_due_date(due_raw)
+        if due_dt is None:
             continue
         delta = (due_dt - now).days
         if delta == 0:
@@ -512,38 +494,23 @@ def notifications():
         elif delta == 1:
             due_alerts.append({'ts': datetime.utcnow().isoformat(), 'kind': 'due', 'message': f"Due Tomorrow: {t.get('title')}", 'due': due_raw})
 
-    # show due alerts first, then persisted notes (latest first)
-    combined = list(reversed(due_alerts)) + list(reversed(notes))
-    # format timestamps for display (DD-MM-YYYY HH:MM:SS) and format any due dates in messages
-    def _fmt_iso_ts(iso_str):
-        try:
-            dt = datetime.fromisoformat(iso_str)
-            return dt.strftime('%d-%m-%Y %H:%M:%S')
-        except Exception:
-            return iso_str
-
+    # show due alerts first, then persisted notes (already latest first)
+    combined = list(reversed(due_alerts)) + notes
+    # display-friendly timestamp and due date (DD-MM-YYYY HH:MM:SS)
     for item in combined:
-        # add a display-friendly timestamp (when applicable)
-        item['ts_display'] = _fmt_iso_ts(item.get('ts', ''))
-        # if this is a due-alert, also provide a display-ready due date
-        try:
-            due_raw = item.get('due')
-            if due_raw:
-                try:
-                    item['due_display'] = datetime.fromisoformat(due_raw).strftime('%d-%m-%Y %H:%M:%S')
-                except Exception:
-                    try:
-                        item['due_display'] = datetime.fromisoformat(due_raw).date().strftime('%d-%m-%Y')
-                    except Exception:
-                        item['due_display'] = due_raw
-            else:
-                item['due_display'] = ''
-        except Exception:
-            item['due_display'] = ''
-    return render_template('notifications.html', notifications=combined, unread_count=len(notes))
+        item['ts_display'] = format_ts(item.get('ts', ''))
+        item['due_display'] = format_ts(item.get('due')) if item.get('due') else ''
+    return render_template(
+        'notifications.html',
+        notifications=combined,
+        unread_count=count_notifications(),
+        page=page,
+        has_prev=page > 1,
+        has_next=has_next,
+    )
 
 
-@app.route('/notifications/clear', methods=['POST'])
+@bp.route('/notifications/clear', methods=['POST'])
 def notifications_clear():
     """Clear persisted notifications and redirect back to notifications page."""
     try:
@@ -551,17 +518,132 @@ def notifications_clear():
         flash('Notifications cleared', 'success')
     except Exception:
         flash('Failed to clear notifications', 'danger')
-    return redirect(url_for('notifications'))
+    return redirect(url_for('.notifications'))
+
+
+def _format_sse(note) -> str:
+    """Encode a notification dict as a single Server-Sent Events message."""
+    return f"event: notification\ndata: {json.dumps(note)}\n\n"
 
 
-@app.route('/settings', methods=['GET', 'POST'])
+def stream_chunk(new_notes, cursor):
+    """Return `(chunk, cursor)` for one poll of the notification stream.
+
+    `new_notes` are the notifications persisted after `cursor` (the `ts` of
+    the last one sent). The chunk holds an SSE message per new entry, or a
+    keep-alive comment so dead clients are noticed when nothing changed.
+    """
+    if not new_notes:
+        return ': keep-alive\n\n', cursor
+    return ''.join(_format_sse(n) for n in new_notes), new_notes[-1].get('ts', cursor)
+
+
+def _latest_ts(tenant=None):
+    latest = latest_notifications(1, tenant=tenant)
+    return latest[0].get('ts') if latest else None
+
+
+@bp.route('/api/notifications/stream')
+def notifications_stream():
+    """Stream newly persisted notifications as Server-Sent Events.
+
+    Every `STREAM_POLL_SECONDS` reads the notifications newer than the last
+    one sent (only today's segment in practice) and pushes them. Under a
+    WSGI server each open stream holds a worker thread for its whole
+    lifetime; the ASGI entrypoint (`asgi.py`) serves this path natively
+    instead.
+    """
+    # the generator outlives the request context, so pin the shard now
+    tenant = current_tenant()
+
+    def _events():
+        cursor = _latest_ts(tenant)
+        yield ': connected\n\n'
+        while True:
+            time.sleep(STREAM_POLL_SECONDS)
+            chunk, cursor = stream_chunk(notifications_since(cursor, tenant=tenant), cursor)
+            yield chunk
+
+    return Response(_events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+# Job endpoints. `jobs` is imported on first use so workers that never run a
+# job don't pay for the process-pool machinery at start-up.
+
+def _job_or_404(job_id):
+    from jobs import get_job
+
+    job = get_job(job_id, current_tenant())
+    if job is None:
+        abort(404, 'job not found')
+    return job
+
+
+def _job_response(job, status=200):
+    data = job.to_dict()
+    if data['status'] == 'done':
+        data['result_url'] = url_for('.api_job_result', job_id=job.id)
+    return jsonify(data), status
+
+
+@bp.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """Queue a background job (`{"kind": "export"|"stats", ...}`).
+
+    Returns HTTP 202 with the job status and a `Location` header pointing
+    at `/api/jobs/<id>`; 400 for an unknown kind/option and 429 when the
+    job queue is full.
+    """
+    from jobs import submit_job, JobQueueFull
+
+    payload = request.get_json(silent=True) or {}
+    try:
+        job = submit_job(payload.get('kind'), current_tenant(), payload)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    except JobQueueFull as exc:
+        return jsonify({'error': str(exc)}), 429
+    resp, status = _job_response(job, 202)
+    resp.headers['Location'] = url_for('.api_job_status', job_id=job.id)
+    return resp, status
+
+
+@bp.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job_status(job_id):
+    """Return the status of a job (queued/running/done/failed/cancelled)."""
+    return _job_response(_job_or_404(job_id))
+
+
+@bp.route('/api/jobs/<job_id>', methods=['DELETE'])
+def api_cancel_job(job_id):
+    """Cancel a queued job. Returns 409 if it is already running or finished."""
+    from jobs import cancel_job
+
+    job = _job_or_404(job_id)
+    if not cancel_job(job):
+        return jsonify({'error': f'job is {job.status} and cannot be cancelled'}), 409
+    return _job_response(job)
+
+
+@bp.route('/api/jobs/<job_id>/result', methods=['GET'])
+def api_job_result(job_id):
+    """Stream a finished job's result file; 409 until the job is done."""
+    job = _job_or_404(job_id)
+    if job.status != 'done':
+        return jsonify({'error': f'job is {job.status}'}), 409
+    if not os.path.exists(job.result_path):
+        abort(404, 'job result expired')
+    return send_file(job.result_path, mimetype=job.mimetype, as_attachment=True, download_name=job.download_name)
+
+
+@bp.route('/settings', methods=['GET', 'POST'])
 def settings():
     """Settings page to choose Light/Dark theme. Persists choice in a cookie."""
     if request.method == 'POST':
         theme = (request.form.get('theme') or '').lower()
         if theme not in ('light', 'dark'):
             theme = 'light'
-        resp = make_response(redirect(url_for('settings')))
+        resp = make_response(redirect(url_for('.settings')))
         # persist for 365 days
         resp.set_cookie('theme', theme, max_age=60 * 60 * 24 * 365)
         flash('Theme updated', 'success')
@@ -569,8 +651,39 @@ def settings():
 
     # GET -> render page; read cookie to know current theme
     current_theme = request.cookies.get('theme', 'light')
-    return render_template('settings.html', current_theme=current_theme, unread_count=len(read_notifications()))
+    return render_template('settings.html', current_theme=current_theme, unread_count=count_notifications())
+
+
+def create_app(config=None):
+    """Build and configure a Flask application for the Task Manager.
+
+    `config` is an optional mapping applied over the defaults:
+    - `SECRET_KEY`: session signing key (default `$TASK_MANAGER_SECRET_KEY`).
+      Required unless `DEBUG` or `TESTING` is set, in which case a
+      development placeholder is used.
+    - `WARM_TASK_CACHE`: load `tasks.json` into the task store cache now
+      rather than on the first request (default True)
+
+    Nothing is configured at import time, so each short-lived worker pays
+    only for what it uses; the optional SQLAlchemy layer in `models.py` is
+    imported lazily on first access.
+
+    Raises RuntimeError if no secret key is configured outside DEBUG/TESTING.
+    """
+    app = Flask(__name__, static_folder='static', template_folder='templates')
+    app.config['SECRET_KEY'] = os.environ.get('TASK_MANAGER_SECRET_KEY')
+    app.config['WARM_TASK_CACHE'] = True
+    if config:
+        app.config.update(config)
+    if not app.config['SECRET_KEY']:
+        if not (app.config.get('DEBUG') or app.config.get('TESTING')):
+            raise RuntimeError('No secret key configured: set TASK_MANAGER_SECRET_KEY or pass SECRET_KEY to create_app()')
+        app.config['SECRET_KEY'] = _DEV_SECRET_KEY
+    app.register_blueprint(bp)
+    if app.config['WARM_TASK_CACHE']:
+        warm_task_cache()
+    return app
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app({'DEBUG': True}).run(debug=True)
@@ -0,0 +1,107 @@
+"""ASGI entrypoint for serving the Task Manager under an async server.
+
+The Flask routes are mounted unchanged through `a2wsgi.WSGIMiddleware`,
+which runs each request on a bounded thread pool so blocking reads of
+task and notification files never stall the event loop.
+
+`/api/notifications/stream` is served natively here: the connection is a
+coroutine that polls for new notifications via `utils.anotifications_since`
+(thread pool I/O) between sleeps, so an open stream costs no thread.
+
+Run with `python serve.py` or any ASGI server, e.g.
+`uvicorn asgi:application`.
+"""
+
+import asyncio
+from http.cookies import SimpleCookie
+
+from a2wsgi import WSGIMiddleware
+
+from app import create_app, resolve_tenant, stream_chunk, STREAM_POLL_SECONDS, TENANT_HEADER, TENANT_COOKIE
+from utils import alatest_notifications, anotifications_since
+
+STREAM_PATH = '/api/notifications/stream'
+
+# Threads available to plain (non-streaming) Flask requests.
+WSGI_WORKERS = 16
+
+_wsgi_app = WSGIMiddleware(create_app(), workers=WSGI_WORKERS)
+
+
+async def _wait_for_disconnect(receive) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+def _scope_tenant(scope) -> str:
+    """Resolve the tenant from ASGI headers, as `app` does for Flask requests."""
+    headers = {}
+    for name, value in scope.get('headers', []):
+        headers.setdefault(name.decode('latin1').lower(), value.decode('latin1'))
+    cookie = SimpleCookie()
+    try:
+        cookie.load(headers.get('cookie', ''))
+    except Exception:
+        pass
+    morsel = cookie.get(TENANT_COOKIE)
+    return resolve_tenant(headers.get(TENANT_HEADER.lower()), morsel.value if morsel else None)
+
+
+async def notifications_stream(scope, receive, send) -> None:
+    """Async counterpart of `app.notifications_stream`."""
+    try:
+        tenant = _scope_tenant(scope)
+    except ValueError:
+        await send({'type': 'http.response.start', 'status': 400,
+                    'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+        await send({'type': 'http.response.body', 'body': b'invalid tenant id'})
+        return
+    # take the cursor before announcing the stream, as the WSGI view does,
+    # so a notification written after `: connected` is always delivered
+    latest = await alatest_notifications(1, tenant=tenant)
+    cursor = latest[0].get('ts') if latest else None
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': b': connected\n\n', 'more_body': True})
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        while True:
+            await asyncio.wait({disconnected}, timeout=STREAM_POLL_SECONDS)
+            if disconnected.done():
+                return
+            chunk, cursor = stream_chunk(await anotifications_since(cursor, tenant=tenant), cursor)
+            await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+    finally:
+        disconnected.cancel()
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send) -> None:
+    """ASGI callable: native stream endpoint, everything else via Flask."""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] == 'http' and scope['path'] == STREAM_PATH and scope['method'] == 'GET':
+        await notifications_stream(scope, receive, send)
+        return
+    await _wsgi_app(scope, receive, send)
+
+
+__all__ = ['application', 'notifications_stream']
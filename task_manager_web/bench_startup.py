@@ -0,0 +1,65 @@
+"""Cold-start benchmark: time-to-first-response of a fresh worker.
+
+Each run starts a new interpreter, imports `app`, builds the application
+with `create_app(config)` and serves `GET /` through the Flask test client.
+The split between import, factory and first request is reported as the
+median over all runs, with and without warming the task store cache.
+
+Usage:
+    python bench_startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+
+_CHILD = '''
+import json, sys, time
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+app = create_app({'SECRET_KEY': 'bench', 'WARM_TASK_CACHE': %r})
+t2 = time.perf_counter()
+status = app.test_client().get('/').status_code
+t3 = time.perf_counter()
+print(json.dumps({
+    'status': status,
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'first_response_ms': (t3 - t2) * 1000,
+    'total_ms': (t3 - t0) * 1000,
+    'sqlalchemy_loaded': 'sqlalchemy' in sys.modules,
+}))
+'''
+
+
+def run_once(warm: bool) -> dict:
+    out = subprocess.run([sys.executable, '-c', _CHILD % warm], cwd=HERE,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    keys = ['import_ms', 'create_app_ms', 'first_response_ms', 'total_ms']
+    print(f"{'WARM_TASK_CACHE':<16}" + ''.join(f'{k:>20}' for k in keys))
+    for warm in (True, False):
+        runs = [run_once(warm) for _ in range(args.runs)]
+        if any(r['status'] != 200 for r in runs):
+            raise SystemExit('GET / did not return 200')
+        if any(r['sqlalchemy_loaded'] for r in runs):
+            print('warning: SQLAlchemy was imported on the JSON-only path')
+        medians = [statistics.median(r[k] for r in runs) for k in keys]
+        print(f'{str(warm):<16}' + ''.join(f'{m:>20.1f}' for m in medians))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""Storage compaction for the tenant shards.
+
+Runs `utils.compact_shard` and `jobs.sweep_jobs` for every tenant with
+data on disk (or only the one given with `--tenant`), one shard at a time,
+and prints what changed.
+Meant to be scheduled, e.g. nightly from cron or a systemd timer, while
+the server keeps running.
+
+Usage:
+    python compact.py
+    python compact.py --tenant acme
+"""
+
+import argparse
+
+from jobs import sweep_jobs
+from utils import compact_shard, list_tenants, validate_tenant
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tenant', help='compact only this tenant')
+    args = parser.parse_args(argv)
+
+    for tenant in [validate_tenant(args.tenant)] if args.tenant else list_tenants():
+        stats = compact_shard(tenant)
+        stats['jobs_removed'] = sweep_jobs(tenant)
+        print(f'{tenant}: ' + ', '.join(f'{k}={v}' for k, v in stats.items()))
+
+
+if __name__ == '__main__':
+    main()
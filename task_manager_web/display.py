@@ -0,0 +1,121 @@
+"""Memoized display formatting for dates, timestamps and due labels.
+
+Every value here is a pure function of the stored ISO string (plus today's
+date for due labels), so results are cached instead of being re-parsed on
+each render:
+
+- `format_display_ts(iso)` -> 'DD-MM-YYYY' or 'DD-MM-YYYY HH:MM:SS'
+- `format_ts(iso)` -> always 'DD-MM-YYYY HH:MM:SS' (notifications)
+- `parse_due_date(iso)` -> `date` or None (sorting / due alerts)
+- `due_label(iso, today)` -> 'Overdue' / 'Today' / 'Tomorrow' / 'This week' / 'Mon DD'
+
+Display strings use an LRU keyed on the raw string. Due labels are cached
+per (due date, today) and the cache is dropped when the day changes.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+
+# Distinct raw values kept per cache; plenty for a JSON-backed task list.
+CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _display_ts(iso_str: str) -> str:
+    try:
+        dt = datetime.fromisoformat(iso_str)
+        if 'T' not in iso_str and dt.hour == 0 and dt.minute == 0 and dt.second == 0:
+            return dt.strftime('%d-%m-%Y')
+        return dt.strftime('%d-%m-%Y %H:%M:%S')
+    except ValueError:
+        return iso_str
+
+
+def format_display_ts(iso_str) -> str:
+    """Return a human display string for an ISO date/datetime.
+
+    - Date-only strings (e.g. 'YYYY-MM-DD') -> 'DD-MM-YYYY'
+    - Datetime strings (with time) -> 'DD-MM-YYYY HH:MM:SS'
+    Falls back to the original string on parse error.
+    """
+    if not iso_str:
+        return ''
+    return _display_ts(str(iso_str))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _ts(iso_str: str) -> str:
+    try:
+        return datetime.fromisoformat(iso_str).strftime('%d-%m-%Y %H:%M:%S')
+    except ValueError:
+        return iso_str
+
+
+def format_ts(iso_str) -> str:
+    """Return 'DD-MM-YYYY HH:MM:SS' for an ISO value, or the value unchanged."""
+    if not iso_str:
+        return iso_str or ''
+    return _ts(str(iso_str))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _due_date(iso_str: str) -> Optional[date]:
+    try:
+        return datetime.fromisoformat(iso_str).date()
+    except ValueError:
+        return None
+
+
+def parse_due_date(iso_str) -> Optional[date]:
+    """Return the calendar date of an ISO date/datetime, or None."""
+    if not iso_str:
+        return None
+    return _due_date(str(iso_str))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _due_label(iso_str: str, today: date) -> Optional[str]:
+    due_dt = _due_date(iso_str)
+    if due_dt is None:
+        return None
+    delta = (due_dt - today).days
+    if delta < 0:
+        return 'Overdue'
+    if delta == 0:
+        return 'Today'
+    if delta == 1:
+        return 'Tomorrow'
+    if delta <= 7:
+        return 'This week'
+    return due_dt.strftime('%b %d')
+
+
+_due_label_day: Optional[date] = None
+
+
+def due_label(iso_str, today: Optional[date] = None) -> Optional[str]:
+    """Return the relative due label for an ISO due date, or None.
+
+    `today` defaults to the current UTC date. Cached labels are discarded
+    the first time a new day is seen, since they all depend on it.
+    """
+    global _due_label_day
+    if not iso_str:
+        return None
+    if today is None:
+        today = datetime.utcnow().date()
+    if today != _due_label_day:
+        _due_label.cache_clear()
+        _due_label_day = today
+    return _due_label(str(iso_str), today)
+
+
+def cache_clear() -> None:
+    """Drop every cached display value."""
+    for fn in (_display_ts, _ts, _due_date, _due_label):
+        fn.cache_clear()
+
+
+__all__ = ['format_display_ts', 'format_ts', 'parse_due_date', 'due_label', 'cache_clear']
@@ -0,0 +1,440 @@
+"""Background jobs for heavy operations, run on a process pool.
+
+Full exports and stats recomputation walk every task of a tenant, so they
+run outside the request thread on a `concurrent.futures.ProcessPoolExecutor`.
+The web process submits a job and returns immediately; clients poll
+`/api/jobs/<id>` and download the result from `/api/jobs/<id>/result`,
+which is streamed from the file the worker wrote.
+
+Workers receive the tenant's task snapshot straight from the task store
+cache (`utils.read_tasks`) as a job argument, so they never re-read or
+re-parse `tasks.json`.
+
+Job kinds:
+- `export`: all tasks and notifications of the tenant (`format`: json|csv)
+- `stats`: task counts by status, priority, category and due state
+
+Job state is not kept in memory: each job has a `<id>.state.json` record
+next to its result in the shard's `jobs/` directory, updated by the pool
+worker as it runs. Any server process can therefore answer status, result
+and cancel requests, whichever process accepted the job. Leaving `queued`
+is decided by creating `<id>.claim` exclusively, so a worker starting the
+job and a cancel request from another process cannot both win.
+
+Concurrency is bounded across server processes: each one gets
+`JOB_WORKERS // TASK_MANAGER_WORKERS` pool processes (at least one), and
+every unfinished job holds one of `MAX_QUEUED_JOBS` slot files in the
+global `data/job-queue/` directory, taken with `O_EXCL` and released when
+the job ends. Queued jobs can be cancelled; running ones cannot, since pool
+workers cannot be interrupted. Finished jobs are removed after
+`JOB_RESULT_TTL_SECONDS` or once a shard has more than `MAX_FINISHED_JOBS`
+(on submit for that tenant, and for every tenant by `compact.py`);
+unfinished ones older than `JOB_TIMEOUT_SECONDS` (e.g. left by a process
+that died) are reported as failed, their slots reclaimed, and then removed
+the same way.
+"""
+from __future__ import annotations
+
+import csv
+import functools
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from utils import DEFAULT_TENANT, get_shard, read_tasks, read_notifications
+
+JOB_WORKERS = int(os.environ.get('TASK_MANAGER_JOB_WORKERS', '2'))
+MAX_QUEUED_JOBS = int(os.environ.get('TASK_MANAGER_MAX_QUEUED_JOBS', '16'))
+# Server processes sharing the job budget (same variable as serve.py).
+SERVER_WORKERS = max(1, int(os.environ.get('TASK_MANAGER_WORKERS', '1')))
+# Finished jobs kept per shard (with their result files) before the oldest go.
+MAX_FINISHED_JOBS = 100
+JOB_RESULT_TTL_SECONDS = int(os.environ.get('TASK_MANAGER_JOB_RESULT_TTL', str(24 * 3600)))
+# An unfinished job not updated for this long is treated as abandoned.
+JOB_TIMEOUT_SECONDS = int(os.environ.get('TASK_MANAGER_JOB_TIMEOUT', '3600'))
+
+EXPORT_FORMATS = ('json', 'csv')
+_CSV_FIELDS = ('id', 'title', 'description', 'priority', 'due_date', 'status', 'category', 'completed', 'created_at')
+
+_JOB_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+_STATE_SUFFIX = '.state.json'
+_CLAIM_SUFFIX = '.claim'
+_UNFINISHED = ('queued', 'running')
+
+
+class JobQueueFull(Exception):
+    """Raised when `MAX_QUEUED_JOBS` jobs are already queued or running."""
+
+
+def _write_result(out_path: str, write: Callable) -> str:
+    """Write a result file atomically so readers never see partial output."""
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(out_path))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            write(f)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return out_path
+
+
+# Job state records. Only one writer exists at a time: the submitter while
+# queued, then whoever wins the claim (pool worker or cancel request).
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _read_state(state_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def _update_state(state_path: str, **changes: Any) -> None:
+    state = _read_state(state_path) or {}
+    state.update(changes)
+    _write_result(state_path, lambda f: json.dump(state, f))
+
+
+def _job_id(state_path: str) -> str:
+    return os.path.basename(state_path)[:-len(_STATE_SUFFIX)]
+
+
+def _claim(state_path: str) -> bool:
+    """Take the job out of `queued`; False if someone already did."""
+    try:
+        os.close(os.open(state_path[:-len(_STATE_SUFFIX)] + _CLAIM_SUFFIX,
+                         os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return False
+    return True
+
+
+# Worker functions: top-level so they can be pickled into pool processes.
+
+def _execute(state_path: str, slot_path: str, fn: Callable, args: tuple) -> None:
+    """Pool entry point: claim the job, run `fn` and record the outcome."""
+    if not _claim(state_path):
+        return  # cancelled while queued; the cancel released the slot
+    try:
+        _update_state(state_path, status='running', started_at=_now())
+        try:
+            fn(*args)
+        except Exception as exc:
+            _update_state(state_path, status='failed', error=str(exc), finished_at=_now())
+        else:
+            _update_state(state_path, status='done', finished_at=_now())
+    finally:
+        _release_slot(slot_path, _job_id(state_path))
+
+
+def _run_export(tasks: List[Dict[str, Any]], tenant: str, fmt: str, out_path: str) -> str:
+    if fmt == 'csv':
+        def _write(f):
+            writer = csv.DictWriter(f, fieldnames=_CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(tasks)
+    else:
+        notes = read_notifications(tenant)
+
+        def _write(f):
+            json.dump({
+                'tenant': tenant,
+                'exported_at': datetime.utcnow().isoformat(),
+                'tasks': tasks,
+                'notifications': notes,
+            }, f, indent=2)
+    return _write_result(out_path, _write)
+
+
+def _run_stats(tasks: List[Dict[str, Any]], out_path: str) -> str:
+    today = datetime.utcnow().date()
+    stats: Dict[str, Any] = {
+        'total': len(tasks),
+        'completed': 0,
+        'pending': 0,
+        'high_priority': 0,
+        'overdue': 0,
+        'by_status': {},
+        'by_priority': {},
+        'by_category': {},
+    }
+    for t in tasks:
+        completed = bool(t.get('completed')) or str(t.get('status', '')).lower() in ('done', 'completed')
+        stats['completed' if completed else 'pending'] += 1
+        try:
+            priority = int(t.get('priority', 3))
+        except (TypeError, ValueError):
+            priority = 3
+        if priority >= 4:
+            stats['high_priority'] += 1
+        stats['by_priority'][str(priority)] = stats['by_priority'].get(str(priority), 0) + 1
+        status = str(t.get('status') or 'Pending')
+        stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
+        cat = (t.get('category') or '').strip()
+        if cat:
+            stats['by_category'][cat] = stats['by_category'].get(cat, 0) + 1
+        if not completed and t.get('due_date'):
+            try:
+                if datetime.fromisoformat(str(t['due_date'])).date() < today:
+                    stats['overdue'] += 1
+            except ValueError:
+                pass
+    stats['generated_at'] = datetime.utcnow().isoformat()
+    return _write_result(out_path, lambda f: json.dump(stats, f, indent=2))
+
+
+class Job:
+    """A job as read from its state record."""
+
+    def __init__(self, state: Dict[str, Any], jobs_dir: str, updated: float) -> None:
+        self.id = state['id']
+        self.kind = state['kind']
+        self.tenant = state['tenant']
+        self.result_path = os.path.join(jobs_dir, state['result'])
+        self.mimetype = state['mimetype']
+        self.created_at = state.get('created_at')
+        self.finished_at: Optional[str] = state.get('finished_at')
+        self.error: Optional[str] = state.get('error')
+        self.status: str = state.get('status', 'queued')
+        if self.status in _UNFINISHED and time.time() - updated > JOB_TIMEOUT_SECONDS:
+            self.status = 'failed'
+            self.error = 'job was abandoned'
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(os.path.dirname(self.result_path), self.id + _STATE_SUFFIX)
+
+    @property
+    def download_name(self) -> str:
+        return f'{self.kind}-{self.id}{os.path.splitext(self.result_path)[1]}'
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+        if self.status == 'failed':
+            data['error'] = self.error
+        return data
+
+
+def _load_job(state_path: str) -> Optional[Job]:
+    state = _read_state(state_path)
+    if state is None:
+        return None
+    try:
+        return Job(state, os.path.dirname(state_path), os.path.getmtime(state_path))
+    except (KeyError, OSError):
+        return None
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _jobs_dir(tenant: str) -> str:
+    return os.path.join(os.path.dirname(get_shard(tenant).data_file), 'jobs')
+
+
+def _queue_dir() -> str:
+    # data/job-queue: one slot file per unfinished job, shared by every
+    # tenant and server process
+    return os.path.join(os.path.dirname(get_shard(DEFAULT_TENANT).data_file), 'job-queue')
+
+
+def _take_slot(job_id: str) -> Optional[str]:
+    """Create a free `slot-<n>` file holding `job_id`; None if all are taken.
+
+    Slots older than `JOB_TIMEOUT_SECONDS` belong to abandoned jobs and are
+    reclaimed once the queue looks full.
+    """
+    queue_dir = _queue_dir()
+    os.makedirs(queue_dir, exist_ok=True)
+    for reclaim in (False, True):
+        taken = set(os.listdir(queue_dir))
+        if reclaim:
+            cutoff = time.time() - JOB_TIMEOUT_SECONDS
+            for name in taken:
+                try:
+                    if os.path.getmtime(os.path.join(queue_dir, name)) < cutoff:
+                        os.remove(os.path.join(queue_dir, name))
+                except OSError:
+                    pass
+            taken = set(os.listdir(queue_dir))
+        for n in range(MAX_QUEUED_JOBS):
+            slot_path = os.path.join(queue_dir, f'slot-{n}')
+            if f'slot-{n}' in taken:
+                continue
+            try:
+                fd = os.open(slot_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(job_id)
+            return slot_path
+    return None
+
+
+def _release_slot(slot_path: Optional[str], job_id: str) -> None:
+    # only if the slot is still ours: a reclaimed slot may hold another job
+    try:
+        with open(slot_path, 'r', encoding='utf-8') as f:
+            if f.read() == job_id:
+                os.remove(slot_path)
+    except (OSError, TypeError):
+        pass
+
+
+def _sweep(jobs_dir: str) -> int:
+    """Remove expired jobs and stray files from `jobs_dir`; return jobs removed.
+
+    A job goes once it is finished (or abandoned) and older than
+    `JOB_RESULT_TTL_SECONDS`, or when more than `MAX_FINISHED_JOBS` finished
+    jobs remain. Files with no state record (temp files, results from older
+    versions) are removed after the same TTL.
+    """
+    try:
+        names = os.listdir(jobs_dir)
+    except OSError:
+        return 0
+    now = time.time()
+    finished = []
+    for name in names:
+        if name.endswith(_STATE_SUFFIX):
+            job = _load_job(os.path.join(jobs_dir, name))
+            if job is not None and job.status not in _UNFINISHED:
+                finished.append((os.path.getmtime(job.state_path), job.id))
+    finished.sort(reverse=True)
+    expired = {job_id for i, (mtime, job_id) in enumerate(finished)
+               if i >= MAX_FINISHED_JOBS or now - mtime > JOB_RESULT_TTL_SECONDS}
+    known = {name[:-len(_STATE_SUFFIX)] for name in names if name.endswith(_STATE_SUFFIX)}
+
+    for name in names:
+        path = os.path.join(jobs_dir, name)
+        job_id = name.split('.', 1)[0]
+        try:
+            if job_id in expired or (job_id not in known and now - os.path.getmtime(path) > JOB_RESULT_TTL_SECONDS):
+                os.remove(path)
+        except OSError:
+            pass
+    return len(expired)
+
+
+def sweep_jobs(tenant: str) -> int:
+    """Remove `tenant`'s expired jobs and stray job files; return jobs removed."""
+    return _sweep(_jobs_dir(tenant))
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    # Created on first use so web workers that never run a job skip the
+    # process start-up. 'spawn' avoids forking a multi-threaded server.
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max(1, JOB_WORKERS // SERVER_WORKERS),
+                                        mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+
+def _fail_if_lost(state_path: str, future: Future) -> None:
+    """Record a job whose pool process died (the worker could not)."""
+    if future.cancelled() or future.exception() is None:
+        return
+    state = _read_state(state_path) or {}
+    if _claim(state_path) or state.get('status') == 'running':
+        _update_state(state_path, status='failed', error=str(future.exception()), finished_at=_now())
+        _release_slot(state.get('slot'), _job_id(state_path))
+
+
+def submit_job(kind: str, tenant: str, options: Optional[Dict[str, Any]] = None) -> Job:
+    """Queue a job of `kind` for `tenant` and return it.
+
+    Raises ValueError for an unknown kind or option and `JobQueueFull` when
+    the queue is at capacity.
+    """
+    options = options or {}
+    job_id = uuid.uuid4().hex
+    out_dir = _jobs_dir(tenant)
+    if kind == 'export':
+        fmt = options.get('format') or 'json'
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f'format must be one of {", ".join(EXPORT_FORMATS)}')
+        result, mimetype = f'{job_id}.{fmt}', 'text/csv' if fmt == 'csv' else 'application/json'
+        fn, args = _run_export, (read_tasks(tenant), tenant, fmt, os.path.join(out_dir, result))
+    elif kind == 'stats':
+        result, mimetype = f'{job_id}.json', 'application/json'
+        fn, args = _run_stats, (read_tasks(tenant), os.path.join(out_dir, result))
+    else:
+        raise ValueError('kind must be one of export, stats')
+
+    state_path = os.path.join(out_dir, job_id + _STATE_SUFFIX)
+    slot_path = _take_slot(job_id)
+    if slot_path is None:
+        raise JobQueueFull(f'{MAX_QUEUED_JOBS} jobs already queued')
+    try:
+        _sweep(out_dir)
+        _write_result(state_path, lambda f: json.dump({
+            'id': job_id,
+            'kind': kind,
+            'tenant': tenant,
+            'status': 'queued',
+            'result': result,
+            'mimetype': mimetype,
+            'slot': slot_path,
+            'created_at': _now(),
+        }, f))
+        try:
+            future = _get_executor().submit(_execute, state_path, slot_path, fn, args)
+        except BrokenProcessPool:
+            # a worker died (e.g. killed by the OS); start a fresh pool
+            global _executor
+            _executor = None
+            future = _get_executor().submit(_execute, state_path, slot_path, fn, args)
+    except BaseException:
+        _release_slot(slot_path, job_id)
+        raise
+
+    future.add_done_callback(functools.partial(_fail_if_lost, state_path))
+    return _load_job(state_path)
+
+
+def get_job(job_id: str, tenant: str) -> Optional[Job]:
+    """Return the job if it exists and belongs to `tenant`."""
+    if not _JOB_ID_RE.match(job_id or ''):
+        return None
+    return _load_job(os.path.join(_jobs_dir(tenant), job_id + _STATE_SUFFIX))
+
+
+def cancel_job(job: Job) -> bool:
+    """Cancel a queued job; returns False if it already started or finished.
+
+    `job.status` is refreshed either way.
+    """
+    if job.status not in _UNFINISHED or not _claim(job.state_path):
+        current = _load_job(job.state_path)
+        if current is not None:
+            job.status, job.finished_at, job.error = current.status, current.finished_at, current.error
+        return False
+    job.status, job.finished_at = 'cancelled', _now()
+    _update_state(job.state_path, status='cancelled', finished_at=job.finished_at)
+    _release_slot((_read_state(job.state_path) or {}).get('slot'), job.id)
+    return True
+
+
+__all__ = ['Job', 'JobQueueFull', 'submit_job', 'get_job', 'cancel_job', 'sweep_jobs']
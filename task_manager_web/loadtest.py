@@ -0,0 +1,197 @@
+"""Concurrent-connection load test for the WSGI and ASGI serving modes.
+
+Opens many long-lived `/api/notifications/stream` connections, then measures
+`/api/tasks` latency while those streams are held open. With `--compare` it
+starts both servers itself (the threaded Flask/Werkzeug server used by
+`main.py`, and `serve.py`) and prints the results side by side, including
+the server's OS thread count on platforms that expose `/proc`.
+
+Usage:
+    python loadtest.py --compare --streams 500
+    python loadtest.py --port 8000 --streams 200 --requests 500
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+STREAM_PATH = '/api/notifications/stream'
+PROBE_PATH = '/api/tasks'
+
+
+def _request(host: str, path: str) -> bytes:
+    return (f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n').encode('ascii')
+
+
+async def open_stream(host: str, port: int, timeout: float):
+    """Open a stream connection; return `(reader, writer)` or None on failure."""
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(_request(host, STREAM_PATH))
+        await writer.drain()
+        await asyncio.wait_for(reader.readuntil(b': connected'), timeout)
+        return reader, writer
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        return None
+
+
+async def timed_get(host: str, port: int, path: str, timeout: float):
+    """Fetch `path` and return elapsed seconds, or None on failure."""
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(_request(host, path))
+        await writer.drain()
+        status = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+    except (OSError, asyncio.TimeoutError):
+        return None
+    if b' 200 ' not in status:
+        return None
+    return time.perf_counter() - start
+
+
+def thread_count(pid: int | None):
+    """Return the OS thread count of `pid` from /proc, or None if unavailable."""
+    if pid is None:
+        return None
+    try:
+        with open(f'/proc/{pid}/status', 'r', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('Threads:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _percentile(values, pct: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def run(host: str, port: int, streams: int, requests: int,
+              concurrency: int = 10, timeout: float = 10.0, pid: int | None = None):
+    """Hold `streams` stream connections open and probe request latency."""
+    opened = await asyncio.gather(*(open_stream(host, port, timeout) for _ in range(streams)))
+    held = [s for s in opened if s is not None]
+    threads = thread_count(pid)
+
+    latencies = []
+    failures = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _probe():
+        nonlocal failures
+        async with sem:
+            elapsed = await timed_get(host, port, PROBE_PATH, timeout)
+        if elapsed is None:
+            failures += 1
+        else:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_probe() for _ in range(requests)))
+    wall = time.perf_counter() - start
+
+    for _, writer in held:
+        writer.close()
+
+    return {
+        'streams_open': len(held),
+        'streams_requested': streams,
+        'server_threads': threads,
+        'requests_ok': len(latencies),
+        'requests_failed': failures,
+        'req_per_sec': len(latencies) / wall if wall else 0.0,
+        'p50_ms': (_percentile(latencies, 0.50) or 0.0) * 1000,
+        'p95_ms': (_percentile(latencies, 0.95) or 0.0) * 1000,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def _start_server(mode: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, TASK_MANAGER_PORT=str(port))
+    env.setdefault('TASK_MANAGER_SECRET_KEY', 'loadtest')
+    if mode == 'wsgi':
+        cmd = [sys.executable, '-m', 'flask', '--app', 'app', 'run',
+               '--port', str(port), '--with-threads', '--no-reload', '--no-debugger']
+    else:
+        cmd = [sys.executable, 'serve.py']
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _wait_for_port(port)
+    return proc
+
+
+def _print_table(results) -> None:
+    keys = ['streams_open', 'server_threads', 'requests_ok', 'requests_failed',
+            'req_per_sec', 'p50_ms', 'p95_ms']
+    modes = list(results)
+    print(f"{'metric':<18}" + ''.join(f'{m:>12}' for m in modes))
+    for k in keys:
+        row = []
+        for m in modes:
+            v = results[m][k]
+            row.append(f'{"n/a":>12}' if v is None else (f'{v:>12.1f}' if isinstance(v, float) else f'{v:>12}'))
+        print(f'{k:<18}' + ''.join(row))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--streams', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--compare', action='store_true',
+                        help='start WSGI and ASGI servers locally and compare them')
+    args = parser.parse_args(argv)
+
+    if not args.compare:
+        result = asyncio.run(run(args.host, args.port, args.streams, args.requests,
+                                 args.concurrency, args.timeout))
+        _print_table({'server': result})
+        return
+
+    results = {}
+    for mode in ('wsgi', 'asgi'):
+        port = _free_port()
+        proc = _start_server(mode, port)
+        try:
+            results[mode] = asyncio.run(run('127.0.0.1', port, args.streams, args.requests,
+                                            args.concurrency, args.timeout, pid=proc.pid))
+        finally:
+            proc.terminate()
+            proc.wait()
+    print(f'{args.streams} concurrent streams, {args.requests} probe requests')
+    _print_table(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,12 @@
 """Entrypoint for running the Task Manager Flask application.
 
 Execute this module to start a development server on the default Flask
-port. In production use a WSGI server and set `debug=False`.
+port. In production use `serve.py` (ASGI) or point a WSGI server at
+`app:create_app()`.
 """
 
-from app import app
+from app import create_app
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app({'DEBUG': True}).run(debug=True)
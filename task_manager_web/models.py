@@ -4,51 +4,70 @@ This module defines a `Task` ORM model alongside helper functions to
 create the engine/session and initialize the database file. The model is
 kept optional for projects that prefer the simple JSON storage used by the
 app; switching to SQLAlchemy is supported via these helpers.
+
+SQLAlchemy is imported lazily: `Base` and `Task` are built on first
+attribute access (PEP 562 module `__getattr__`), so importing this module
+costs nothing for workers that only use the JSON store.
 """
 
 import os
 from datetime import datetime
-from sqlalchemy import (
-    create_engine, Column, String, Integer, Text, DateTime, Boolean, Enum
-)
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-
-Base = declarative_base()
 
 STATUS_CHOICES = ('pending', 'in_progress', 'done', 'archived')
 
+_orm = {}
 
-class Task(Base):
-    __tablename__ = 'tasks'
 
-    id = Column(String(36), primary_key=True)
-    title = Column(String(255), nullable=False)
-    description = Column(Text, default='')
-    priority = Column(Integer, default=3)
-    due_date = Column(DateTime, nullable=True)
-    status = Column(Enum(*STATUS_CHOICES, name='task_status'), default='pending')
-    category = Column(String(100), default='')
-    created_at = Column(DateTime, default=datetime.utcnow)
+def _build_orm():
+    """Import SQLAlchemy and define `Base` / `Task` once."""
+    if _orm:
+        return _orm
+    from sqlalchemy import Column, String, Integer, Text, DateTime, Enum
+    from sqlalchemy.ext.declarative import declarative_base
 
-    """Represents a single task row in the database.
+    Base = declarative_base()
 
-    Fields mirror the JSON representation used by the rest of the app and
-    `to_dict()` returns a JSON-serializable mapping suitable for templates
-    and APIs.
-    """
+    class Task(Base):
+        __tablename__ = 'tasks'
+
+        id = Column(String(36), primary_key=True)
+        title = Column(String(255), nullable=False)
+        description = Column(Text, default='')
+        priority = Column(Integer, default=3)
+        due_date = Column(DateTime, nullable=True)
+        status = Column(Enum(*STATUS_CHOICES, name='task_status'), default='pending')
+        category = Column(String(100), default='')
+        created_at = Column(DateTime, default=datetime.utcnow)
+
+        """Represents a single task row in the database.
 
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description or '',
-            'priority': self.priority,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'status': self.status,
-            'category': self.category or '',
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-        }
+        Fields mirror the JSON representation used by the rest of the app and
+        `to_dict()` returns a JSON-serializable mapping suitable for templates
+        and APIs.
+        """
+
+        def to_dict(self):
+            return {
+                'id': self.id,
+                'title': self.title,
+                'description': self.description or '',
+                'priority': self.priority,
+                'due_date': self.due_date.isoformat() if self.due_date else None,
+                'status': self.status,
+                'category': self.category or '',
+                'created_at': self.created_at.isoformat() if self.created_at else None,
+            }
+
+    Task.__module__ = __name__
+    Task.__qualname__ = 'Task'
+    _orm.update(Base=Base, Task=Task)
+    return _orm
+
+
+def __getattr__(name):
+    if name in ('Base', 'Task'):
+        return _build_orm()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _default_db_url():
@@ -65,6 +84,9 @@ def _default_db_url():
 
 
 def create_engine_and_session(db_url: str | None = None):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
     url = db_url or _default_db_url()
     engine = create_engine(url, connect_args={"check_same_thread": False})
     Session = sessionmaker(bind=engine)
@@ -73,7 +95,7 @@ def create_engine_and_session(db_url: str | None = None):
 
 def init_db(db_url: str | None = None):
     engine, _ = create_engine_and_session(db_url)
-    Base.metadata.create_all(engine)
+    _build_orm()['Base'].metadata.create_all(engine)
 
 
 __all__ = ['Base', 'Task', 'create_engine_and_session', 'init_db']
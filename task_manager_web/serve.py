@@ -0,0 +1,31 @@
+"""Production launcher for the Task Manager ASGI application.
+
+Runs `asgi:application` under uvicorn with debug disabled. `main.py`
+remains the development entrypoint.
+
+Configuration comes from environment variables:
+- `TASK_MANAGER_HOST` (default `127.0.0.1`)
+- `TASK_MANAGER_PORT` (default `8000`)
+- `TASK_MANAGER_WORKERS` (default `1`) — number of server processes
+  (background job pool processes are divided between them, see `jobs.py`)
+"""
+
+import os
+
+import uvicorn
+
+
+def main() -> None:
+    here = os.path.abspath(os.path.dirname(__file__))
+    uvicorn.run(
+        'asgi:application',
+        app_dir=here,
+        host=os.environ.get('TASK_MANAGER_HOST', '127.0.0.1'),
+        port=int(os.environ.get('TASK_MANAGER_PORT', '8000')),
+        workers=int(os.environ.get('TASK_MANAGER_WORKERS', '1')),
+        log_level='info',
+    )
+
+
+if __name__ == '__main__':
+    main()
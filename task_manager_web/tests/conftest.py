@@ -0,0 +1,24 @@
+import os
+import sys
+import weakref
+from collections import OrderedDict
+
+import pytest
+
+# The app modules are imported flat (`import utils`), as main.py does.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import utils  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point every storage shard at an empty temporary data directory."""
+    monkeypatch.setattr(utils, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(utils, 'DATA_FILE', str(tmp_path / 'tasks.json'))
+    monkeypatch.setattr(utils, 'NOTIFY_DIR', str(tmp_path / 'notifications'))
+    monkeypatch.setattr(utils, 'NOTIFY_FILE', str(tmp_path / 'notifications.json'))
+    monkeypatch.setattr(utils, 'TENANTS_DIR', str(tmp_path / 'tenants'))
+    monkeypatch.setattr(utils, '_shards', OrderedDict())
+    monkeypatch.setattr(utils, '_live_shards', weakref.WeakValueDictionary())
+    return tmp_path
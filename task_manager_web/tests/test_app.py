@@ -0,0 +1,25 @@
+import pytest
+
+from app import create_app
+
+
+def test_create_app_requires_secret_key_outside_debug(store, monkeypatch):
+    monkeypatch.delenv('TASK_MANAGER_SECRET_KEY', raising=False)
+    with pytest.raises(RuntimeError):
+        create_app()
+
+
+def test_create_app_secret_key_sources(store, monkeypatch):
+    monkeypatch.delenv('TASK_MANAGER_SECRET_KEY', raising=False)
+    assert create_app({'SECRET_KEY': 'explicit'}).secret_key == 'explicit'
+    assert create_app({'TESTING': True}).secret_key  # development placeholder
+    monkeypatch.setenv('TASK_MANAGER_SECRET_KEY', 'from-env')
+    assert create_app().secret_key == 'from-env'
+
+
+def test_my_tasks_renders_formatted_due_date(store):
+    import utils
+
+    utils.write_tasks([{'id': '1', 'title': 'Report', 'due_date': '2026-01-05', 'created_at': '2026-01-01'}])
+    html = create_app({'TESTING': True}).test_client().get('/my-tasks').get_data(as_text=True)
+    assert '05-01-2026' in html
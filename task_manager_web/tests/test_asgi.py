@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def asgi_mod(store, monkeypatch):
+    monkeypatch.setenv('TASK_MANAGER_SECRET_KEY', 'test')
+    import asgi
+
+    monkeypatch.setattr(asgi, 'STREAM_POLL_SECONDS', 0.02)
+    return asgi
+
+
+def _scope(path, method='GET', headers=()):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'root_path': '', 'query_string': b'', 'headers': list(headers),
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+
+
+class _Client:
+    """Collects sent ASGI messages; `receive` blocks until `disconnect()`."""
+
+    def __init__(self, body=None):
+        self.sent = []
+        self._body = body
+        self._gone = asyncio.Event()
+
+    async def receive(self):
+        if self._body is not None:
+            body, self._body = self._body, None
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await self._gone.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    def disconnect(self):
+        self._gone.set()
+
+    @property
+    def status(self):
+        return next(m['status'] for m in self.sent if m['type'] == 'http.response.start')
+
+    @property
+    def body(self):
+        return b''.join(m.get('body', b'') for m in self.sent if m['type'] == 'http.response.body')
+
+    async def wait_for_body(self, needle, timeout=5.0):
+        async def _poll():
+            while needle not in self.body:
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(_poll(), timeout)
+
+
+def test_scope_tenant_reads_header_then_cookie(asgi_mod):
+    assert asgi_mod._scope_tenant(_scope('/')) == utils.DEFAULT_TENANT
+    assert asgi_mod._scope_tenant(_scope('/', headers=[(b'x-tenant', b'acme')])) == 'acme'
+    assert asgi_mod._scope_tenant(_scope('/', headers=[(b'cookie', b'theme=dark; tenant=beta')])) == 'beta'
+    both = [(b'cookie', b'tenant=beta'), (b'x-tenant', b'acme')]
+    assert asgi_mod._scope_tenant(_scope('/', headers=both)) == 'acme'
+
+
+def test_stream_rejects_invalid_tenant(asgi_mod):
+    client = _Client()
+    scope = _scope(asgi_mod.STREAM_PATH, headers=[(b'x-tenant', b'../etc')])
+    asyncio.run(asgi_mod.notifications_stream(scope, client.receive, client.send))
+    assert client.status == 400
+    assert client.body == b'invalid tenant id'
+
+
+def test_stream_delivers_new_events_and_stops_on_disconnect(asgi_mod):
+    utils.add_notification('before connect', tenant='acme')
+
+    async def scenario():
+        client = _Client()
+        scope = _scope(asgi_mod.STREAM_PATH, headers=[(b'cookie', b'tenant=acme')])
+        stream = asyncio.create_task(asgi_mod.notifications_stream(scope, client.receive, client.send))
+        await client.wait_for_body(b': connected')
+        await asyncio.to_thread(utils.add_notification, 'hello', 'info', 'acme')
+        await asyncio.to_thread(utils.add_notification, 'other tenant')
+        await client.wait_for_body(b'hello')
+        client.disconnect()
+        await asyncio.wait_for(stream, 2.0)
+        return client
+
+    client = asyncio.run(scenario())
+    assert client.status == 200
+    events = [json.loads(line[len('data: '):]) for line in client.body.decode().splitlines()
+              if line.startswith('data: ')]
+    assert [e['message'] for e in events] == ['hello']
+
+
+def test_application_handles_lifespan(asgi_mod):
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(asgi_mod.application({'type': 'lifespan'}, receive, send))
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+def test_application_passes_other_requests_to_flask(asgi_mod):
+    utils.write_tasks([{'id': '1', 'title': 'from flask'}], tenant='acme')
+
+    async def scenario():
+        client = _Client(body=b'')
+        await asgi_mod.application(_scope('/api/tasks', headers=[(b'x-tenant', b'acme')]),
+                                   client.receive, client.send)
+        return client
+
+    client = asyncio.run(scenario())
+    assert client.status == 200
+    assert [t['title'] for t in json.loads(client.body)] == ['from flask']
@@ -0,0 +1,31 @@
+from datetime import date
+
+import display
+
+
+def test_format_display_ts_date_only_and_datetime():
+    assert display.format_display_ts('2026-01-05') == '05-01-2026'
+    assert display.format_display_ts('2026-01-05T07:31:20.840375') == '05-01-2026 07:31:20'
+    assert display.format_display_ts('2026-01-05T00:00:00') == '05-01-2026 00:00:00'
+    assert display.format_ts('2026-01-05') == '05-01-2026 00:00:00'
+
+
+def test_malformed_values_fall_back():
+    assert display.format_display_ts('next friday') == 'next friday'
+    assert display.format_ts('next friday') == 'next friday'
+    assert display.format_display_ts(None) == ''
+    assert display.parse_due_date('next friday') is None
+    assert display.due_label('next friday', date(2026, 1, 1)) is None
+    assert display.due_label('', date(2026, 1, 1)) is None
+
+
+def test_due_label_cache_is_dropped_when_the_day_changes():
+    display.cache_clear()
+    assert display.due_label('2026-01-02', date(2026, 1, 1)) == 'Tomorrow'
+    assert display.due_label('2026-01-03', date(2026, 1, 1)) == 'This week'
+    assert display._due_label.cache_info().currsize == 2
+
+    assert display.due_label('2026-01-02', date(2026, 1, 2)) == 'Today'
+    assert display._due_label.cache_info().currsize == 1
+    assert display.due_label('2026-01-02', date(2026, 1, 3)) == 'Overdue'
+    assert display.due_label('2026-03-02', date(2026, 1, 3)) == 'Mar 02'
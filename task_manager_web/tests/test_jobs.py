@@ -0,0 +1,117 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future
+
+import pytest
+
+import jobs
+import utils
+
+
+class _IdleExecutor:
+    """Accepts jobs without running them, so they stay queued."""
+
+    def submit(self, fn, *args):
+        return Future()
+
+
+@pytest.fixture
+def idle_pool(monkeypatch):
+    monkeypatch.setattr(jobs, '_get_executor', lambda: _IdleExecutor())
+
+
+def test_job_status_and_result_are_served_from_disk(store):
+    utils.write_tasks([{'id': 1, 'title': 'a', 'status': 'Pending', 'priority': 5}])
+    try:
+        job = jobs.submit_job('stats', utils.DEFAULT_TENANT)
+        deadline = time.monotonic() + 60
+        while jobs.get_job(job.id, utils.DEFAULT_TENANT).status in ('queued', 'running'):
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+    finally:
+        if jobs._executor is not None:
+            jobs._executor.shutdown()
+            jobs._executor = None
+
+    # a fresh lookup (as another server process would do) sees the outcome
+    done = jobs.get_job(job.id, utils.DEFAULT_TENANT)
+    assert done.status == 'done' and done.finished_at
+    with open(done.result_path, encoding='utf-8') as f:
+        assert json.load(f)['high_priority'] == 1
+    assert jobs.get_job(job.id, 'acme') is None
+    assert os.listdir(jobs._queue_dir()) == []  # slot released by the worker
+
+
+def test_cancelled_job_is_skipped_by_the_worker(store, idle_pool):
+    job = jobs.submit_job('stats', utils.DEFAULT_TENANT)
+    assert jobs.cancel_job(jobs.get_job(job.id, utils.DEFAULT_TENANT))
+
+    def _must_not_run():
+        raise AssertionError('cancelled job ran')
+    jobs._execute(job.state_path, None, _must_not_run, ())
+
+    assert jobs.get_job(job.id, utils.DEFAULT_TENANT).status == 'cancelled'
+    assert not jobs.cancel_job(job)
+    assert os.listdir(jobs._queue_dir()) == []
+
+
+def test_queue_limit_counts_jobs_of_every_tenant(store, idle_pool, monkeypatch):
+    monkeypatch.setattr(jobs, 'MAX_QUEUED_JOBS', 2)
+    utils.write_tasks([], tenant='acme')
+    jobs.submit_job('stats', utils.DEFAULT_TENANT)
+    jobs.submit_job('export', 'acme', {'format': 'csv'})
+    with pytest.raises(jobs.JobQueueFull):
+        jobs.submit_job('stats', 'acme')
+    assert sorted(os.listdir(jobs._queue_dir())) == ['slot-0', 'slot-1']
+
+
+def test_abandoned_slots_are_reclaimed(store, idle_pool, monkeypatch):
+    monkeypatch.setattr(jobs, 'MAX_QUEUED_JOBS', 1)
+    lost = jobs.submit_job('stats', utils.DEFAULT_TENANT)
+    old = time.time() - jobs.JOB_TIMEOUT_SECONDS - 60
+    os.utime(os.path.join(jobs._queue_dir(), 'slot-0'), (old, old))
+
+    job = jobs.submit_job('stats', utils.DEFAULT_TENANT)
+    with open(os.path.join(jobs._queue_dir(), 'slot-0'), encoding='utf-8') as f:
+        assert f.read() == job.id
+    jobs._release_slot(os.path.join(jobs._queue_dir(), 'slot-0'), lost.id)  # no longer its slot
+    assert os.listdir(jobs._queue_dir()) == ['slot-0']
+
+
+def test_sweep_removes_expired_jobs_and_stray_files(store, idle_pool):
+    job = jobs.submit_job('stats', utils.DEFAULT_TENANT)
+    jobs.cancel_job(job)
+    jobs_dir = os.path.dirname(job.state_path)
+    stray = os.path.join(jobs_dir, 'tmpleftover')
+    open(stray, 'w').close()
+    kept = jobs.submit_job('stats', utils.DEFAULT_TENANT)
+
+    old = time.time() - jobs.JOB_RESULT_TTL_SECONDS - 60
+    for name in os.listdir(jobs_dir):
+        if not name.startswith(kept.id):
+            os.utime(os.path.join(jobs_dir, name), (old, old))
+    assert jobs._sweep(jobs_dir) == 1
+
+    assert sorted(os.listdir(jobs_dir)) == [kept.id + '.state.json']
+    assert jobs.get_job(kept.id, utils.DEFAULT_TENANT).status == 'queued'
+
+
+def _try_slot(job_id, results):
+    results.put(jobs._take_slot(job_id) is not None)
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_slots_bound_concurrent_submits_across_processes(store, monkeypatch):
+    monkeypatch.setattr(jobs, 'MAX_QUEUED_JOBS', 3)
+    ctx = multiprocessing.get_context('fork')
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_try_slot, args=(f'{i:032x}', results)) for i in range(8)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    assert sum(results.get() for _ in procs) == 3
+    assert len(os.listdir(jobs._queue_dir())) == 3
@@ -0,0 +1,115 @@
+import json
+import multiprocessing
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import utils
+
+
+def _write_segment(store, day, notes):
+    seg_dir = store / 'notifications'
+    seg_dir.mkdir(exist_ok=True)
+    with open(seg_dir / f'{day}.jsonl', 'a', encoding='utf-8') as f:
+        for note in notes:
+            f.write(json.dumps(note) + '\n')
+
+
+def _note(ts, message='m'):
+    return {'ts': ts, 'kind': 'info', 'message': message}
+
+
+def test_legacy_file_is_migrated_into_day_segments(store):
+    legacy = [
+        _note('2026-01-02T12:28:36.538266', 'a'),
+        _note('2026-01-02T12:30:45.084642', 'b'),
+        _note('2026-01-05T07:31:20.840375', 'c'),
+    ]
+    (store / 'notifications.json').write_text(json.dumps(legacy), encoding='utf-8')
+
+    assert utils.read_notifications() == legacy
+    assert not (store / 'notifications.json').exists()
+    assert sorted(p.name for p in (store / 'notifications').glob('*.jsonl')) == [
+        '2026-01-02.jsonl', '2026-01-05.jsonl',
+    ]
+
+
+def test_interrupted_migration_does_not_duplicate_notes(store):
+    legacy = [_note('2026-01-02T12:28:36', 'a'), _note('2026-01-02T12:30:45', 'b'), _note('2026-01-05T07:31:20', 'c')]
+    (store / 'notifications.json').write_text(json.dumps(legacy), encoding='utf-8')
+    # a previous run wrote one day, and a note arrived, before it crashed
+    _write_segment(store, '2026-01-02', legacy[:2] + [_note('2026-01-02T13:00:00', 'new')])
+
+    assert [n['message'] for n in utils.read_notifications()] == ['a', 'b', 'new', 'c']
+    assert not (store / 'notifications.json').exists()
+
+
+def test_latest_notifications_pages_newest_first_across_segments(store):
+    _write_segment(store, '2026-01-01', [_note('2026-01-01T10:00:00', 'n1'), _note('2026-01-01T11:00:00', 'n2')])
+    _write_segment(store, '2026-01-02', [_note('2026-01-02T10:00:00', 'n3')])
+    _write_segment(store, '2026-01-03', [_note('2026-01-03T10:00:00', 'n4'), _note('2026-01-03T11:00:00', 'n5')])
+
+    pages = [[n['message'] for n in utils.latest_notifications(2, offset=o)] for o in (0, 2, 4, 6)]
+    assert pages == [['n5', 'n4'], ['n3', 'n2'], ['n1'], []]
+
+
+def test_notifications_since_returns_newer_entries_oldest_first(store):
+    _write_segment(store, '2026-01-01', [_note('2026-01-01T10:00:00', 'old')])
+    _write_segment(store, '2026-01-02', [_note('2026-01-02T10:00:00', 'a'), _note('2026-01-02T11:00:00', 'b')])
+
+    assert [n['message'] for n in utils.notifications_since('2026-01-02T10:00:00')] == ['b']
+    assert [n['message'] for n in utils.notifications_since(None)] == ['old', 'a', 'b']
+
+
+def test_prune_notifications_drops_only_segments_past_retention(store):
+    today = datetime.utcnow().date()
+    old_day = (today - timedelta(days=40)).isoformat()
+    recent_day = (today - timedelta(days=5)).isoformat()
+    _write_segment(store, old_day, [_note(old_day + 'T10:00:00')])
+    _write_segment(store, recent_day, [_note(recent_day + 'T10:00:00')])
+
+    assert utils.prune_notifications(30) == 1
+    assert [n['ts'][:10] for n in utils.read_notifications()] == [recent_day]
+    assert utils.prune_notifications(None) == 0  # retention disabled by default
+
+
+def test_count_notifications_tracks_appends_and_clear(store):
+    assert utils.count_notifications() == 0
+    utils.add_notification('one')
+    utils.add_notification('two')
+    assert utils.count_notifications() == 2
+    utils.clear_notifications()
+    assert utils.count_notifications() == 0
+
+
+def test_concurrent_appends_are_stored_in_timestamp_order(store):
+    threads = [threading.Thread(target=lambda: [utils.add_notification('x') for _ in range(25)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stamps = [n['ts'] for n in utils.read_notifications()]
+    assert len(stamps) == 100
+    assert stamps == sorted(stamps)
+
+
+def _append_many(count):
+    for _ in range(count):
+        utils.add_notification('x')
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_appends_from_several_processes_are_stored_in_timestamp_order(store):
+    # forked children inherit the patched data paths of the `store` fixture
+    ctx = multiprocessing.get_context('fork')
+    procs = [ctx.Process(target=_append_many, args=(50,)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    stamps = [n['ts'] for n in utils.read_notifications()]
+    assert len(stamps) == 200
+    assert stamps == sorted(stamps)
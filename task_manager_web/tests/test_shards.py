@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+import pytest
+
+import utils
+from app import create_app
+
+
+def test_reads_of_unknown_tenant_touch_nothing(store):
+    client = create_app({'TESTING': True, 'WARM_TASK_CACHE': False}).test_client()
+    for i in range(5):
+        assert client.get('/settings', headers={'X-Tenant': f'probe{i}'}).status_code == 200
+        assert client.get('/api/tasks', headers={'X-Tenant': f'probe{i}'}).get_json() == []
+
+    assert not (store / 'tenants').exists()
+    assert all(t == utils.DEFAULT_TENANT for t in utils._shards)
+
+
+def test_first_write_creates_and_registers_shard(store):
+    assert utils.read_tasks('acme') == []
+    utils.write_tasks([{'id': '1', 'title': 'a'}], tenant='acme')
+    utils.add_notification('hello', tenant='acme')
+
+    assert (store / 'tenants' / 'acme' / 'tasks.json').exists()
+    assert 'acme' in utils._shards
+    assert utils.read_tasks() == []
+    assert utils.count_notifications() == 0
+    assert utils.count_notifications('acme') == 1
+
+
+def test_shard_registry_is_bounded(store, monkeypatch):
+    monkeypatch.setattr(utils, 'MAX_CACHED_SHARDS', 3)
+    utils.get_shard(utils.DEFAULT_TENANT)
+    for i in range(6):
+        utils.write_tasks([], tenant=f't{i}')
+        utils.get_shard(f't{i}')
+
+    assert len(utils._shards) == 3
+    assert utils.DEFAULT_TENANT in utils._shards
+    assert utils.read_tasks('t0') == []  # evicted shards still work
+
+
+def test_invalid_tenant_is_rejected(store):
+    with pytest.raises(ValueError):
+        utils.get_shard('../etc')
+
+
+def test_tenant_keeps_one_shard_while_in_use(store, monkeypatch):
+    first = utils.get_shard('newco')  # no directory yet: not registered
+    utils.write_tasks([], tenant='newco')
+    assert utils.get_shard('newco') is first
+
+    monkeypatch.setattr(utils, 'MAX_CACHED_SHARDS', 1)
+    utils.write_tasks([], tenant='other')
+    utils.get_shard('other')
+    assert 'newco' not in utils._shards
+    assert utils.get_shard('newco').notify_lock is first.notify_lock
+
+
+def test_compact_shard_cleans_storage_but_spares_fresh_temp_files(store):
+    utils.add_notification('kept', tenant='acme')
+    (store / 'tenants' / 'acme' / 'tasks.json').write_text(json.dumps([{'id': '1', 'title': 'a'}, 'junk']))
+    segment = next((store / 'tenants' / 'acme' / 'notifications').glob('*.jsonl'))
+    with open(segment, 'a', encoding='utf-8') as f:
+        f.write('{not json\n')
+    stale = store / 'tenants' / 'acme' / 'tmpstale'
+    fresh = store / 'tenants' / 'acme' / 'tmpfresh'
+    stale.write_text('')
+    fresh.write_text('')
+    old = time.time() - utils.TEMP_FILE_MAX_AGE_SECONDS - 60
+    os.utime(stale, (old, old))
+
+    stats = utils.compact_shard('acme')
+
+    assert stats == {'segments_pruned': 0, 'segments_rewritten': 1, 'tasks_dropped': 1, 'temp_files_removed': 1}
+    assert [n['message'] for n in utils.read_notifications('acme')] == ['kept']
+    assert utils.read_tasks('acme') == [{'id': '1', 'title': 'a'}]
+    assert fresh.exists() and not stale.exists()
+    assert utils.compact_shard('acme')['segments_rewritten'] == 0
@@ -1,54 +1,245 @@
 """Utility helpers to read/write tasks to data/tasks.json safely.
 
+Storage is sharded per tenant. Each tenant's tasks and notifications live
+in their own files, behind their own cache and locks (see `Shard`), so
+writes for one tenant never lock, parse or rewrite another tenant's data.
+The `default` tenant keeps the original layout under `data/`; every other
+tenant lives under `data/tenants/<tenant>/`. A tenant's directory is only
+created by its first write: reads of an unknown tenant return empty results
+without touching the disk or the shard registry.
+
+The helpers below act on the tenant of the current context (set with
+`set_current_tenant()` / `use_tenant()`), or on an explicit `tenant=`.
+
 Functions:
 - `read_tasks()` -> list of tasks (returns empty list on missing/invalid file)
 - `write_tasks(tasks)` -> atomically write tasks list to disk
+- `warm_task_cache()` -> pre-load the task store cache
+- `latest_notifications(limit, offset)` / `notifications_since(ts)` -> notification
+  range queries over day-partitioned segment files
+- `compact_shard()` / `compact_all_shards()` -> per-shard storage compaction
+- `aread_tasks()` / `alatest_notifications()` / `anotifications_since()` ->
+  awaitable variants for ASGI code
 """
 from __future__ import annotations
 
+import contextvars
 import json
 import os
+import re
 import tempfile
-from typing import Any, Dict, List
-from datetime import datetime
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+DATA_FILE = os.path.join(DATA_DIR, 'tasks.json')
+# Notifications are stored as append-only JSON-lines segment files
+# partitioned by UTC day: <shard>/notifications/YYYY-MM-DD.jsonl. Segment
+# names sort chronologically, so "latest N" and "since X" queries only open
+# the newest segments and retention drops whole files.
+NOTIFY_DIR = os.path.join(DATA_DIR, 'notifications')
+# Legacy single-array file; migrated into the default shard on first use.
+NOTIFY_FILE = os.path.join(DATA_DIR, 'notifications.json')
+SEGMENT_SUFFIX = '.jsonl'
+# Lock file in each notification directory, shared by every server process.
+NOTIFY_LOCK_NAME = '.notify.lock'
+
+TENANTS_DIR = os.path.join(DATA_DIR, 'tenants')
+DEFAULT_TENANT = 'default'
+_TENANT_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+# Shards kept in the registry; the least recently used are evicted first.
+MAX_CACHED_SHARDS = 256
+# Temp files younger than this may belong to a write still in progress in
+# another process, so compaction leaves them alone.
+TEMP_FILE_MAX_AGE_SECONDS = 3600
+
+# Days of notification history to keep (None keeps everything). Can be set
+# with the TASK_MANAGER_NOTIFY_RETENTION_DAYS environment variable.
+_retention_env = os.environ.get('TASK_MANAGER_NOTIFY_RETENTION_DAYS')
+NOTIFY_RETENTION_DAYS: Optional[int] = int(_retention_env) if _retention_env else None
+
+
+class Shard:
+    """Storage for one tenant: its files, task store cache and locks.
+
+    `lock` guards the task file and its cache; `notify_lock` guards the
+    notification segments within this process (see `_notify_guard` for
+    the cross-process lock). Neither is shared between tenants.
+    """
+
+    def __init__(self, tenant: str, data_file: str, notify_dir: str,
+                 legacy_notify_file: Optional[str] = None) -> None:
+        self.tenant = tenant
+        self.data_file = data_file
+        self.notify_dir = notify_dir
+        self.legacy_notify_file = legacy_notify_file
+        # parsed contents of data_file keyed on its mtime and size, so
+        # repeated reads skip JSON parsing until the file changes
+        self.task_cache: Dict[str, Any] = {'stamp': None, 'tasks': []}
+        # per-segment notification counts keyed on the segment's mtime and
+        # size: day -> (stamp, count)
+        self.segment_counts: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+        self.notify_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'Shard({self.tenant!r})'
+
+
+_shards: 'OrderedDict[str, Shard]' = OrderedDict()
+# Every shard still referenced anywhere, registered or not, so a tenant
+# never has two live shards (and two sets of locks) at once.
+_live_shards: 'weakref.WeakValueDictionary[str, Shard]' = weakref.WeakValueDictionary()
+_shards_lock = threading.Lock()
+_current_tenant: contextvars.ContextVar[str] = contextvars.ContextVar('tenant', default=DEFAULT_TENANT)
+
 
-DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'tasks.json')
+def validate_tenant(tenant: str) -> str:
+    """Return `tenant` if it is a safe shard name, else raise ValueError."""
+    if not isinstance(tenant, str) or not _TENANT_RE.match(tenant):
+        raise ValueError(f'invalid tenant id: {tenant!r}')
+    return tenant
 
 
-def _ensure_datafile() -> None:
-    dirpath = os.path.dirname(DATA_FILE)
+def set_current_tenant(tenant: str) -> contextvars.Token:
+    """Route storage calls in the current context to `tenant`'s shard."""
+    return _current_tenant.set(validate_tenant(tenant))
+
+
+def reset_current_tenant(token: contextvars.Token) -> None:
+    """Undo a `set_current_tenant()` call."""
+    _current_tenant.reset(token)
+
+
+def current_tenant() -> str:
+    return _current_tenant.get()
+
+
+@contextmanager
+def use_tenant(tenant: str):
+    """Context manager form of `set_current_tenant()`."""
+    token = set_current_tenant(tenant)
+    try:
+        yield
+    finally:
+        reset_current_tenant(token)
+
+
+def _shard_base(tenant: str) -> str:
+    return DATA_DIR if tenant == DEFAULT_TENANT else os.path.join(TENANTS_DIR, tenant)
+
+
+def get_shard(tenant: Optional[str] = None) -> Shard:
+    """Shard router: return the `Shard` for `tenant` (default: current).
+
+    Only tenants with data on disk are kept in the registry, which is an
+    LRU capped at `MAX_CACHED_SHARDS`. Any other tenant gets a shard that
+    is not registered; its reads are empty and its first write creates the
+    directory. A shard that is unregistered or evicted but still in use is
+    handed out again rather than replaced, so each tenant has one set of
+    locks at a time.
+    """
+    tenant = tenant or _current_tenant.get()
+    with _shards_lock:
+        shard = _shards.get(tenant)
+        if shard is not None:
+            _shards.move_to_end(tenant)
+            return shard
+    validate_tenant(tenant)
+    base = _shard_base(tenant)
+    register = tenant == DEFAULT_TENANT or os.path.isdir(base)
+    with _shards_lock:
+        shard = _live_shards.get(tenant)
+        if shard is None:
+            if tenant == DEFAULT_TENANT:
+                shard = Shard(tenant, DATA_FILE, NOTIFY_DIR, NOTIFY_FILE)
+            else:
+                shard = Shard(tenant, os.path.join(base, 'tasks.json'), os.path.join(base, 'notifications'))
+            _live_shards[tenant] = shard
+        if register:
+            _shards[tenant] = shard
+            _shards.move_to_end(tenant)
+            while len(_shards) > MAX_CACHED_SHARDS:
+                oldest = next(t for t in _shards if t != DEFAULT_TENANT)
+                del _shards[oldest]
+    return shard
+
+
+def list_tenants() -> List[str]:
+    """Return every tenant with data on disk, default first."""
+    tenants = [DEFAULT_TENANT]
+    if os.path.isdir(TENANTS_DIR):
+        tenants.extend(sorted(
+            name for name in os.listdir(TENANTS_DIR)
+            if _TENANT_RE.match(name) and name != DEFAULT_TENANT
+        ))
+    return tenants
+
+
+def _ensure_datafile(shard: Shard) -> None:
+    dirpath = os.path.dirname(shard.data_file)
     os.makedirs(dirpath, exist_ok=True)
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
+    if not os.path.exists(shard.data_file):
+        with open(shard.data_file, 'w', encoding='utf-8') as f:
             json.dump([], f)
 
 
-def read_tasks() -> List[Dict[str, Any]]:
+def _file_stamp(path: str):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def read_tasks(tenant: Optional[str] = None) -> List[Dict[str, Any]]:
     """Read and return the list of tasks from the JSON file.
 
-    If the file is missing or malformed, returns an empty list.
+    If the file is missing or malformed, returns an empty list (nothing is
+    created on disk). Results are served from the shard's task store cache
+    while the file is unchanged; each call returns fresh task dicts, so
+    callers may mutate them freely.
     """
-    _ensure_datafile()
+    shard = get_shard(tenant)
     try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError, ValueError):
+        stamp = _file_stamp(shard.data_file)
+    except FileNotFoundError:
         return []
+    with shard.lock:
+        cache = shard.task_cache
+        if cache['stamp'] != stamp:
+            try:
+                with open(shard.data_file, 'r', encoding='utf-8') as f:
+                    tasks = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError, ValueError):
+                tasks = []
+            cache['stamp'] = stamp
+            cache['tasks'] = tasks if isinstance(tasks, list) else []
+        tasks = cache['tasks']
+    return [dict(t) for t in tasks if isinstance(t, dict)]
 
 
-def write_tasks(tasks: List[Dict[str, Any]]) -> None:
-    """Atomically write the tasks list to the JSON file.
+def warm_task_cache(tenant: Optional[str] = None) -> int:
+    """Load the task file into the shard's task store cache; return the task count."""
+    return len(read_tasks(tenant))
 
-    Uses a temporary file in the same directory and then replaces the
-    original to avoid partial writes.
-    """
-    _ensure_datafile()
-    dirpath = os.path.dirname(DATA_FILE)
-    fd, tmp_path = tempfile.mkstemp(dir=dirpath)
+
+def _atomic_write(path: str, write) -> None:
+    """Write `path` via a temp file in the same directory and `os.replace`."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
     try:
         with os.fdopen(fd, 'w', encoding='utf-8') as tmpf:
-            json.dump(tasks, tmpf, indent=2)
-        os.replace(tmp_path, DATA_FILE)
+            write(tmpf)
+        os.replace(tmp_path, path)
     finally:
         if os.path.exists(tmp_path):
             try:
@@ -57,59 +248,348 @@ def write_tasks(tasks: List[Dict[str, Any]]) -> None:
                 pass
 
 
-# Notifications helpers (stored in data/notifications.json)
-NOTIFY_FILE = os.path.join(os.path.dirname(__file__), 'data', 'notifications.json')
+def write_tasks(tasks: List[Dict[str, Any]], tenant: Optional[str] = None) -> None:
+    """Atomically write the tasks list to the JSON file.
 
+    Uses a temporary file in the same directory and then replaces the
+    original to avoid partial writes. The shard's task store cache is
+    refreshed with the written list.
+    """
+    shard = get_shard(tenant)
+    _ensure_datafile(shard)
+    with shard.lock:
+        _atomic_write(shard.data_file, lambda f: json.dump(tasks, f, indent=2))
+        shard.task_cache['stamp'] = _file_stamp(shard.data_file)
+        shard.task_cache['tasks'] = [dict(t) for t in tasks]
 
-def _ensure_notifyfile() -> None:
-    dirpath = os.path.dirname(NOTIFY_FILE)
-    os.makedirs(dirpath, exist_ok=True)
-    if not os.path.exists(NOTIFY_FILE):
-        with open(NOTIFY_FILE, 'w', encoding='utf-8') as f:
-            json.dump([], f)
+
+# Notifications helpers
+
+def _segment_path(shard: Shard, day: str) -> str:
+    return os.path.join(shard.notify_dir, day + SEGMENT_SUFFIX)
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Hold an exclusive lock on `path` (created if missing) across processes."""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10s; keep waiting
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def _notify_guard(shard: Shard, create: bool = False):
+    """Serialize changes to a shard's segments across threads and processes.
+
+    serve.py can run several server processes, so `notify_lock` alone would
+    let two of them stamp and append out of order. The lock file lives in
+    the notification directory; with `create=False` a missing directory is
+    left alone (it has no segments to protect).
+    """
+    with shard.notify_lock:
+        if create:
+            os.makedirs(shard.notify_dir, exist_ok=True)
+        elif not os.path.isdir(shard.notify_dir):
+            yield
+            return
+        with _file_lock(os.path.join(shard.notify_dir, NOTIFY_LOCK_NAME)):
+            yield
+
+
+def _append_to_segment(shard: Shard, note: Dict[str, Any]) -> None:
+    with open(_segment_path(shard, str(note.get('ts', ''))[:10]), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(note) + '\n')
 
 
-def read_notifications() -> List[Dict[str, Any]]:
-    """Read persisted notifications from disk. Returns [] on error."""
-    _ensure_notifyfile()
+def _migrate_legacy_notifications(shard: Shard) -> None:
+    """Move the legacy array file into day segments.
+
+    Each affected segment is rebuilt in a temp file and swapped in with
+    `os.replace`, holding the legacy notes plus any existing lines that are
+    not among them. That makes a rerun after a crash produce the same
+    segments instead of appending the notes again; the legacy file is only
+    removed once every segment is in place.
+    """
     try:
-        with open(NOTIFY_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(shard.legacy_notify_file, 'r', encoding='utf-8') as f:
+            notes = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError, ValueError):
+        notes = []
+    by_day: Dict[str, List[Dict[str, Any]]] = {}
+    for note in notes if isinstance(notes, list) else []:
+        if isinstance(note, dict) and note.get('ts'):
+            by_day.setdefault(str(note['ts'])[:10], []).append(note)
+    for day, day_notes in by_day.items():
+        migrated = {json.dumps(n, sort_keys=True) for n in day_notes}
+        existing = [n for n in _read_segment(shard, day) if json.dumps(n, sort_keys=True) not in migrated]
+        merged = sorted(day_notes + existing, key=lambda n: str(n.get('ts', '')))
+        _atomic_write(_segment_path(shard, day), lambda f: f.writelines(json.dumps(n) + '\n' for n in merged))
+    os.remove(shard.legacy_notify_file)
+
+
+def _migrate_if_needed(shard: Shard) -> None:
+    if shard.legacy_notify_file and os.path.exists(shard.legacy_notify_file):
+        with _notify_guard(shard, create=True):
+            if os.path.exists(shard.legacy_notify_file):
+                _migrate_legacy_notifications(shard)
+
+
+def _segment_days(shard: Shard) -> List[str]:
+    """Return the days that have a segment file, oldest first."""
+    _migrate_if_needed(shard)
+    return _list_segment_days(shard)
+
+
+def _list_segment_days(shard: Shard) -> List[str]:
+    # `_segment_days` without the migration check, for use under `_notify_guard`
+    try:
+        names = os.listdir(shard.notify_dir)
+    except FileNotFoundError:
         return []
+    return sorted(
+        name[:-len(SEGMENT_SUFFIX)]
+        for name in names
+        if name.endswith(SEGMENT_SUFFIX)
+    )
 
 
-def write_notifications(notes: List[Dict[str, Any]]) -> None:
-    """Atomically write notifications list to disk."""
-    _ensure_notifyfile()
-    dirpath = os.path.dirname(NOTIFY_FILE)
-    fd, tmp_path = tempfile.mkstemp(dir=dirpath)
+def _read_segment(shard: Shard, day: str) -> List[Dict[str, Any]]:
+    """Read one segment, oldest first. Malformed lines are skipped."""
+    notes = []
     try:
-        with os.fdopen(fd, 'w', encoding='utf-8') as tmpf:
-            json.dump(notes, tmpf, indent=2)
-        os.replace(tmp_path, NOTIFY_FILE)
-    finally:
-        if os.path.exists(tmp_path):
+        with open(_segment_path(shard, day), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    notes.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return notes
+
+
+def _iter_newest_first(shard: Shard) -> Iterator[Dict[str, Any]]:
+    for day in reversed(_segment_days(shard)):
+        yield from reversed(_read_segment(shard, day))
+
+
+def read_notifications(tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read every persisted notification, oldest first.
+
+    Prefer `latest_notifications()` / `notifications_since()`, which only
+    open the segments they need.
+    """
+    shard = get_shard(tenant)
+    notes: List[Dict[str, Any]] = []
+    for day in _segment_days(shard):
+        notes.extend(_read_segment(shard, day))
+    return notes
+
+
+def latest_notifications(limit: int, offset: int = 0, tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return up to `limit` notifications newest first, skipping `offset`.
+
+    Segments are read from the newest backwards and reading stops as soon
+    as the requested page is filled.
+    """
+    return list(islice(_iter_newest_first(get_shard(tenant)), offset, offset + limit))
+
+
+def notifications_since(ts: Optional[str], tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return notifications with a timestamp after `ts`, oldest first.
+
+    Only segments from the day of `ts` onwards are read. `None` returns
+    everything.
+    """
+    if not ts:
+        return read_notifications(tenant)
+    shard = get_shard(tenant)
+    notes: List[Dict[str, Any]] = []
+    for day in _segment_days(shard):
+        if day < ts[:10]:
+            continue
+        notes.extend(n for n in _read_segment(shard, day) if str(n.get('ts', '')) > ts)
+    return notes
+
+
+def count_notifications(tenant: Optional[str] = None) -> int:
+    """Return the number of persisted notifications.
+
+    Line counts are cached per segment and only recounted when a segment's
+    mtime or size changes, so a page render just stats the segment files.
+    """
+    shard = get_shard(tenant)
+    days = _segment_days(shard)
+    counts = shard.segment_counts
+    total = 0
+    for day in days:
+        path = _segment_path(shard, day)
+        try:
+            stamp = _file_stamp(path)
+        except FileNotFoundError:
+            continue
+        cached = counts.get(day)
+        if cached is None or cached[0] != stamp:
             try:
-                os.remove(tmp_path)
-            except Exception:
+                with open(path, 'rb') as f:
+                    cached = (stamp, sum(1 for line in f if line.strip()))
+            except FileNotFoundError:
+                continue
+            counts[day] = cached
+        total += cached[1]
+    for day in set(counts) - set(days):
+        counts.pop(day, None)
+    return total
+
+
+def prune_notifications(retention_days: Optional[int] = None, tenant: Optional[str] = None) -> int:
+    """Delete segments older than `retention_days` days; return how many.
+
+    Defaults to `NOTIFY_RETENTION_DAYS`; does nothing if that is None.
+    """
+    if retention_days is None:
+        retention_days = NOTIFY_RETENTION_DAYS
+    if retention_days is None:
+        return 0
+    shard = get_shard(tenant)
+    _migrate_if_needed(shard)
+    cutoff = (datetime.utcnow().date() - timedelta(days=retention_days)).isoformat()
+    removed = 0
+    with _notify_guard(shard):
+        for day in _list_segment_days(shard):
+            if day >= cutoff:
+                break
+            try:
+                os.remove(_segment_path(shard, day))
+                removed += 1
+            except FileNotFoundError:
                 pass
+    return removed
 
 
-def add_notification(message: str, kind: str = 'info') -> None:
-    """Append a notification dict with timestamp and kind.
+def add_notification(message: str, kind: str = 'info', tenant: Optional[str] = None) -> None:
+    """Append a notification dict with timestamp and kind to today's segment.
 
     Example notification: {"ts": "2025-12-31T12:00:00", "kind": "info", "message": "Task created: ..."}
+    Retention is applied whenever a new day's segment is started.
     """
-    notes = read_notifications()
-    notes.append({
-        'ts': datetime.utcnow().isoformat(),
-        'kind': kind,
-        'message': message,
-    })
-    write_notifications(notes)
-
-
-def clear_notifications() -> None:
-    """Remove all persisted notifications (clear the file)."""
-    write_notifications([])
+    shard = get_shard(tenant)
+    _migrate_if_needed(shard)
+    with _notify_guard(shard, create=True):
+        # stamp inside the (cross-process) lock so segment order matches
+        # `ts` order, which the `notifications_since` cursor relies on
+        note = {
+            'ts': datetime.utcnow().isoformat(),
+            'kind': kind,
+            'message': message,
+        }
+        new_segment = not os.path.exists(_segment_path(shard, note['ts'][:10]))
+        _append_to_segment(shard, note)
+    if new_segment:
+        prune_notifications(tenant=shard.tenant)
+
+
+def clear_notifications(tenant: Optional[str] = None) -> None:
+    """Remove all persisted notifications (delete every segment)."""
+    shard = get_shard(tenant)
+    _migrate_if_needed(shard)
+    with _notify_guard(shard):
+        for day in _list_segment_days(shard):
+            try:
+                os.remove(_segment_path(shard, day))
+            except FileNotFoundError:
+                pass
+
+
+def compact_shard(tenant: Optional[str] = None) -> Dict[str, int]:
+    """Compact one tenant's storage without touching any other shard.
+
+    Applies notification retention, rewrites segments that contain
+    malformed or blank lines, rewrites the task file without non-object
+    entries, and removes temp files left behind by interrupted writes
+    (once older than `TEMP_FILE_MAX_AGE_SECONDS`). Returns counts of what
+    was changed. `compact.py` runs it from the command line.
+    """
+    shard = get_shard(tenant)
+    stats = {'segments_pruned': prune_notifications(tenant=shard.tenant),
+             'segments_rewritten': 0, 'tasks_dropped': 0, 'temp_files_removed': 0}
+
+    with _notify_guard(shard):
+        for day in _list_segment_days(shard):
+            path = _segment_path(shard, day)
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+            notes = _read_segment(shard, day)
+            if len(notes) == len(lines):
+                continue
+            _atomic_write(path, lambda f: f.writelines(json.dumps(n) + '\n' for n in notes))
+            stats['segments_rewritten'] += 1
+
+    kept = read_tasks(shard.tenant)
+    with shard.lock:
+        dropped = len(shard.task_cache['tasks']) - len(kept)
+    if dropped:
+        write_tasks(kept, tenant=shard.tenant)
+        stats['tasks_dropped'] = dropped
+
+    data_dir = os.path.dirname(shard.data_file)
+    cutoff = time.time() - TEMP_FILE_MAX_AGE_SECONDS
+    for dirpath in (data_dir, shard.notify_dir):
+        if not os.path.isdir(dirpath):
+            continue
+        for name in os.listdir(dirpath):
+            path = os.path.join(dirpath, name)
+            try:
+                if name.startswith('tmp') and os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    stats['temp_files_removed'] += 1
+            except FileNotFoundError:
+                pass
+    return stats
+
+
+def compact_all_shards() -> Dict[str, Dict[str, int]]:
+    """Run `compact_shard()` for every tenant, one shard at a time."""
+    return {tenant: compact_shard(tenant) for tenant in list_tenants()}
+
+
+# Async variants used by the ASGI entrypoint (`asgi.py`). The blocking file
+# access runs on the event loop's default thread pool so a slow disk never
+# stalls other connections. asyncio is imported on first use to keep it off
+# the cold-start path of WSGI workers. `asyncio.to_thread` copies the current
+# context, so the current tenant carries over.
+async def aread_tasks(tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Awaitable `read_tasks()` that performs the file I/O off the event loop."""
+    import asyncio
+
+    return await asyncio.to_thread(read_tasks, tenant)
+
+
+async def alatest_notifications(limit: int, offset: int = 0, tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Awaitable `latest_notifications()` that performs the file I/O off the event loop."""
+    import asyncio
+
+    return await asyncio.to_thread(latest_notifications, limit, offset, tenant)
+
+
+async def anotifications_since(ts: Optional[str], tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Awaitable `notifications_since()` that performs the file I/O off the event loop."""
+    import asyncio
+
+    return await asyncio.to_thread(notifications_since, ts, tenant)